@@ -12,6 +12,7 @@ import rich_click as click
 from snapcat.sync_cmd import sync
 from snapcat.export_cmd import export
 from snapcat.show_cmd import show
+from snapcat.trace_cmd import trace
 
 
 @click.group()
@@ -33,3 +34,4 @@ def cli(ctx, db_file_name: str):
 cli.add_command(sync)
 cli.add_command(export)
 cli.add_command(show)
+cli.add_command(trace)
@@ -3,6 +3,8 @@ import logging
 import os
 import pathlib
 
+from chia.consensus.constants import replace_str_to_bytes
+from chia.consensus.default_constants import DEFAULT_CONSTANTS, update_testnet_overrides
 from chia.util.config import load_config
 from chia.util.default_root import DEFAULT_ROOT_PATH
 
@@ -15,6 +17,14 @@ self_hostname = chia_config["self_hostname"]
 full_node_rpc_port = chia_config["full_node"]["rpc_port"]
 wallet_rpc_port = chia_config["wallet"]["rpc_port"]
 
+# consensus constants of the full node's network, built the way the node does
+selected_network = chia_config["full_node"]["selected_network"]
+network_overrides = dict(
+    chia_config["full_node"]["network_overrides"]["constants"][selected_network]
+)
+update_testnet_overrides(selected_network, network_overrides)
+consensus_constants = replace_str_to_bytes(DEFAULT_CONSTANTS, **network_overrides)
+
 
 load_dotenv()
 
@@ -37,3 +47,17 @@ if start_height < 0:
     raise Exception(
         "START_HEIGHT environment variable must be set to a number greater than 0"
     )
+
+# Full node RPC pool
+rpc_pool_size: int = int(os.getenv("RPC_POOL_SIZE", "4"))
+rpc_max_concurrency: int = int(os.getenv("RPC_MAX_CONCURRENCY", "16"))
+rpc_max_retries: int = int(os.getenv("RPC_MAX_RETRIES", "5"))
+rpc_timeout: float = float(os.getenv("RPC_TIMEOUT", "30"))
+rpc_backoff: float = float(os.getenv("RPC_BACKOFF", "0.5"))
+rpc_target_latency: float = float(os.getenv("RPC_TARGET_LATENCY", "1.0"))
+
+if rpc_pool_size < 1 or rpc_max_concurrency < 1:
+    raise Exception(
+        "RPC_POOL_SIZE and RPC_MAX_CONCURRENCY environment variables must be set "
+        "to a number greater than 0"
+    )
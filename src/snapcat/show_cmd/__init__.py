@@ -4,6 +4,7 @@ import logging
 import os
 import rich_click as click
 from rich.console import Console
+from rich.table import Table
 from typing import Optional
 
 from chia.types.blockchain_format.sized_bytes import bytes32
@@ -34,6 +35,33 @@ async def get_cat_db_info(db):
     return spend_count, coins_count
 
 
+async def get_cat_db_stats(db, top: int):
+    async with db.execute(
+        """
+            SELECT bucket, holders, amount
+            FROM balance_buckets
+            WHERE holders > 0
+            ORDER BY bucket ASC
+        """
+    ) as cursor:
+        buckets = await cursor.fetchall()
+    async with db.execute(
+        """
+            SELECT inner_puzzle_hash, balance, coins
+            FROM holders
+            WHERE balance > 0
+            ORDER BY balance DESC
+            LIMIT ?
+        """,
+        [top],
+    ) as cursor:
+        top_holders = await cursor.fetchall()
+
+    total_supply = sum([bucket[2] for bucket in buckets])
+    holder_count = sum([bucket[1] for bucket in buckets])
+    return total_supply, holder_count, buckets, top_holders
+
+
 async def get_puzzle_hash_db_info(db, puzzle_hash: bytes32):
     async with db.execute(
         """
@@ -63,9 +91,30 @@ async def get_puzzle_hash_db_info(db, puzzle_hash: bytes32):
     help="The (inner) puzzle hash to show the unspent coins and available balance for",
     type=Bytes32ParamType(),
 )
+@click.option(
+    "-s",
+    "--stats",
+    is_flag=True,
+    default=False,
+    help="Show supply, holder count, balance distribution and top holders",
+)
+@click.option(
+    "-n",
+    "--top",
+    required=False,
+    default=10,
+    help="The number of top holders to show with --stats",
+    type=click.IntRange(min=1),
+)
 @click.pass_context
-def show(ctx, puzzle_hash: Optional[bytes32]):
+def show(ctx, puzzle_hash: Optional[bytes32], stats: bool, top: int):
     async def _show():
+        if puzzle_hash is not None and stats:
+            message = "Provide either a puzzle hash or --stats, not both"
+            log.error(message)
+            console.print(f"[bold red]{message}")
+            exit()
+
         db_file_name = ctx.obj["db_file_name"]
         if db_file_name is None:
             message = "No database file name provided"
@@ -107,6 +156,62 @@ def show(ctx, puzzle_hash: Optional[bytes32]):
                 console.print(
                     f"Available Balance: [bold bright_cyan]{unspent_balance_str}"
                 )
+            elif stats:
+                # show supply and distribution stats
+                async with db.execute(
+                    "SELECT value FROM config WHERE key = 'stats_initialized'"
+                ) as cursor:
+                    row = await cursor.fetchone()
+                    if row is None:
+                        message = "No statistics found, please sync first"
+                        log.error(message)
+                        console.print(f"[bold red]{message}")
+                        exit()
+
+                total_supply, holder_count, buckets, top_holders = (
+                    await get_cat_db_stats(db, top)
+                )
+
+                total_supply_str = f"{total_supply / 1e3:,.3f}"
+                console.print(f"Total Supply: [bold bright_cyan]{total_supply_str}")
+                console.print(f"# of Holders: [bold bright_cyan]{holder_count}")
+
+                table = Table(title="Balance Distribution")
+                table.add_column("Balance", justify="right")
+                table.add_column("Holders", justify="right")
+                table.add_column("Amount", justify="right")
+                table.add_column("Share", justify="right")
+                for bucket, holders, amount in buckets:
+                    table.add_row(
+                        f"{10 ** bucket / 1e3:,.3f} - {10 ** (bucket + 1) / 1e3:,.3f}",
+                        f"{holders}",
+                        f"{amount / 1e3:,.3f}",
+                        f"{amount / max(total_supply, 1):.2%}",
+                    )
+                console.print(table)
+
+                table = Table(title=f"Top {top} Holders")
+                table.add_column("#", justify="right")
+                table.add_column("Puzzle Hash")
+                table.add_column("Coins", justify="right")
+                table.add_column("Balance", justify="right")
+                table.add_column("Share", justify="right")
+                for rank, (inner_puzzle_hash, balance, coins) in enumerate(
+                    top_holders, start=1
+                ):
+                    table.add_row(
+                        f"{rank}",
+                        inner_puzzle_hash,
+                        f"{coins}",
+                        f"{balance / 1e3:,.3f}",
+                        f"{balance / max(total_supply, 1):.2%}",
+                    )
+                console.print(table)
+
+                top_share = sum([holder[1] for holder in top_holders]) / max(
+                    total_supply, 1
+                )
+                console.print(f"Top {top} Share: [bold bright_cyan]{top_share:.2%}")
             else:
                 # show db cat info
                 spend_count, coins_count = await get_cat_db_info(db)
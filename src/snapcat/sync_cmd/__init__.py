@@ -1,10 +1,11 @@
 import asyncio
 import aiosqlite
-from chia.rpc.full_node_rpc_client import FullNodeRpcClient
 from chia.types.blockchain_format.sized_bytes import bytes32
 from chia.util.ints import uint32
 
+from functools import partial
 import logging
+from typing import Dict, Optional
 import rich_click as click
 from rich.console import Console
 from rich.progress import (
@@ -16,23 +17,29 @@ from rich.progress import (
 )
 
 from snapcat.config import (
-    chia_config,
-    chia_root,
-    full_node_rpc_port,
-    self_hostname,
+    consensus_constants,
+    rpc_max_concurrency,
     start_height,
     target_height,
 )
 
 from snapcat.shared import Bytes32ParamType
-from snapcat.sync_cmd.sync import get_full_node_synced, process_block
+from snapcat.sync_cmd.blockchain_db import BlockchainDb, BlockchainDbError
+from snapcat.sync_cmd.rpc_pool import FullNodeRpcPool, RpcRequestFailed
+from snapcat.sync_cmd.stats import create_stats_tables
+from snapcat.sync_cmd.sync import (
+    fetch_block,
+    get_full_node_synced,
+    get_peak_height,
+    process_block,
+)
 
 log = logging.getLogger("snapcat")
 console = Console()
 abort_height = 0
 
 
-async def syncing_full_node(full_node_rpc, sync_progress):
+async def syncing_full_node(rpc_pool, sync_progress):
     log.info("Syncing Full Node")
     full_node_sync_task_id = sync_progress.add_task(
         description="Waiting for full node to sync", total=None
@@ -40,7 +47,7 @@ async def syncing_full_node(full_node_rpc, sync_progress):
 
     while True:
         is_synced, sync_height, sync_progress_height = await get_full_node_synced(
-            full_node_rpc
+            rpc_pool
         )
         if is_synced:
             message = "Full Node is synced"
@@ -61,7 +68,7 @@ async def syncing_full_node(full_node_rpc, sync_progress):
         await asyncio.sleep(5)
 
 
-async def process_blocks(full_node_rpc, sync_progress, db, tail_hash: bytes32):
+async def process_blocks(get_peak, get_block, sync_progress, db, tail_hash: bytes32):
     global abort_height
     async with db.execute(
         "SELECT value FROM config WHERE key = 'last_block_height'"
@@ -74,6 +81,7 @@ async def process_blocks(full_node_rpc, sync_progress, db, tail_hash: bytes32):
         if last_block_height is None
         else max(start_height, last_block_height)
     )
+    abort_height = height
 
     max_height = target_height if target_height > 0 else uint32.MAXIMUM
 
@@ -81,26 +89,46 @@ async def process_blocks(full_node_rpc, sync_progress, db, tail_hash: bytes32):
     process_blocks_task_id = sync_progress.add_task(
         description="[bold bright_cyan]Processing Blocks",
     )
-    while True:
-        _, peak_height, _ = await get_full_node_synced(full_node_rpc)
-        end_height = min(peak_height, max_height)
 
-        if height > end_height:
-            message = f"Processed all blocks from {start_height} to {end_height}"
-            sync_progress.update(process_blocks_task_id, visible=False)
-            log.info(message)
-            print(message)
-            break
+    # blocks are fetched concurrently ahead of the current height (the pool
+    # limits the actual number of in-flight requests) but processed in order
+    fetch_tasks: Dict[int, asyncio.Task] = {}
+    fetch_height = height
+    end_height = -1
+    try:
+        while True:
+            if height > end_height:
+                end_height = min(await get_peak(), max_height)
 
-        await process_block(full_node_rpc, db, tail_hash, height)
+                if height > end_height:
+                    message = (
+                        f"Processed all blocks from {start_height} to {end_height}"
+                    )
+                    sync_progress.update(process_blocks_task_id, visible=False)
+                    log.info(message)
+                    print(message)
+                    break
 
-        sync_progress.update(
-            process_blocks_task_id,
-            completed=height,
-            total=end_height,
-        )
-        height = height + 1
-        abort_height = height
+            while fetch_height <= end_height and len(fetch_tasks) < (
+                2 * rpc_max_concurrency
+            ):
+                fetch_tasks[fetch_height] = asyncio.create_task(get_block(fetch_height))
+                fetch_height = fetch_height + 1
+
+            header_hash, coin_spends = await fetch_tasks.pop(height)
+            await process_block(db, tail_hash, height, header_hash, coin_spends)
+
+            sync_progress.update(
+                process_blocks_task_id,
+                completed=height,
+                total=end_height,
+            )
+            height = height + 1
+            abort_height = height
+    finally:
+        for task in fetch_tasks.values():
+            task.cancel()
+        await asyncio.gather(*fetch_tasks.values(), return_exceptions=True)
 
 
 @click.command(help="Sync or create (if not exist) the CAT holder database.")
@@ -111,8 +139,16 @@ async def process_blocks(full_node_rpc, sync_progress, db, tail_hash: bytes32):
     help="The TAIL hash of CAT",
     type=Bytes32ParamType(),
 )
+@click.option(
+    "-s",
+    "--source",
+    required=False,
+    default=None,
+    help="Read blocks from a full node blockchain database file instead of the RPC",
+    type=click.Path(exists=True, dir_okay=False),
+)
 @click.pass_context
-def sync(ctx, tail_hash: bytes32):
+def sync(ctx, tail_hash: bytes32, source: Optional[str]):
     async def _sync(tail_hash: bytes32) -> None:
         db_file_name = (
             ctx.obj["db_file_name"]
@@ -137,10 +173,29 @@ def sync(ctx, tail_hash: bytes32):
                     coin_name TEXT PRIMARY KEY,
                     inner_puzzle_hash TEXT NOT NULL,
                     amount INTEGER NOT NULL,
-                    created_height INTEGER DEFAULT 0
+                    created_height INTEGER DEFAULT 0,
+                    parent_coin_name TEXT
                 );
                 """
             )
+            async with db.execute("PRAGMA table_info(coins)") as cursor:
+                columns = [row[1] for row in await cursor.fetchall()]
+            lineage_migrated = "parent_coin_name" not in columns
+            if lineage_migrated:
+                # databases synced before the coin lineage was stored
+                await db.execute("ALTER TABLE coins ADD COLUMN parent_coin_name TEXT")
+            await db.execute(
+                """
+                CREATE INDEX IF NOT EXISTS coins_parent_coin_name
+                ON coins(parent_coin_name);
+                """
+            )
+            await db.execute(
+                """
+                CREATE INDEX IF NOT EXISTS coins_inner_puzzle_hash
+                ON coins(inner_puzzle_hash);
+                """
+            )
             await db.execute(
                 """
                 CREATE TABLE IF NOT EXISTS config(
@@ -155,7 +210,17 @@ def sync(ctx, tail_hash: bytes32):
                 """,
                 [tail_hash.hex()],
             )
+            if lineage_migrated:
+                # coins created up to the last synced block have no parent
+                await db.execute(
+                    """
+                    INSERT OR IGNORE INTO config(key, value)
+                    SELECT 'lineage_start_height', CAST(value AS INTEGER) + 1
+                    FROM config WHERE key = 'last_block_height';
+                    """
+                )
             await db.commit()
+            await create_stats_tables(db)
 
             block_progress = Progress(
                 TextColumn("{task.description}"),
@@ -166,14 +231,28 @@ def sync(ctx, tail_hash: bytes32):
                 refresh_per_second=5,
             )
             with block_progress:
-                async with FullNodeRpcClient.create_as_context(
-                    self_hostname,
-                    full_node_rpc_port,
-                    chia_root,
-                    chia_config,
-                ) as full_node_rpc:
-                    await syncing_full_node(full_node_rpc, block_progress)
-                    await process_blocks(full_node_rpc, block_progress, db, tail_hash)
+                if source is not None:
+                    console.print(f"blockchain database: {source}")
+                    async with BlockchainDb.create_as_context(
+                        source, consensus_constants
+                    ) as blockchain_db:
+                        await process_blocks(
+                            blockchain_db.get_peak_height,
+                            blockchain_db.fetch_block,
+                            block_progress,
+                            db,
+                            tail_hash,
+                        )
+                else:
+                    async with FullNodeRpcPool.create_as_context() as rpc_pool:
+                        await syncing_full_node(rpc_pool, block_progress)
+                        await process_blocks(
+                            partial(get_peak_height, rpc_pool),
+                            partial(fetch_block, rpc_pool),
+                            block_progress,
+                            db,
+                            tail_hash,
+                        )
 
     try:
         console.print("[bold red]press Ctrl+C to exit.")
@@ -183,3 +262,7 @@ def sync(ctx, tail_hash: bytes32):
         message = f"Sync cancelled by user at height {abort_height}."
         console.print(f"[bold red]{message}")
         log.info(message)
+    except (RpcRequestFailed, BlockchainDbError) as e:
+        message = f"Sync stopped at height {abort_height}: {e}"
+        console.print(f"[bold red]{message}")
+        log.error(message)
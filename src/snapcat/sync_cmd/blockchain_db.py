@@ -0,0 +1,129 @@
+import aiosqlite
+import asyncio
+from contextlib import asynccontextmanager
+import logging
+import pathlib
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple
+
+from chia.consensus.constants import ConsensusConstants
+from chia.consensus.get_block_generator import get_block_generator
+from chia.full_node.mempool_check_conditions import get_spends_for_block
+from chia.types.blockchain_format.sized_bytes import bytes32
+from chia.types.coin_spend import CoinSpend
+from chia.types.full_block import FullBlock
+from chia.util.full_block_utils import generator_from_block
+from chia.util.ints import uint32
+import zstd  # type: ignore[import-not-found]
+
+log = logging.getLogger("snapcat")
+
+
+class BlockchainDbError(Exception):
+    pass
+
+
+class BlockchainDb:
+    """
+    Reads main chain blocks directly from a full node's v2 blockchain database
+    (blockchain_v2_<network>.sqlite), opened read-only, and runs the block
+    generators locally to get the coin spends.
+    """
+
+    def __init__(self, db: aiosqlite.Connection, constants: ConsensusConstants):
+        self.db = db
+        self.constants = constants
+
+    @classmethod
+    @asynccontextmanager
+    async def create_as_context(
+        cls, path: str, constants: ConsensusConstants
+    ) -> AsyncIterator["BlockchainDb"]:
+        uri = f"{pathlib.Path(path).resolve().as_uri()}?mode=ro"
+        async with aiosqlite.connect(uri, uri=True) as db:
+            async with db.execute("SELECT version FROM database_version") as cursor:
+                row = await cursor.fetchone()
+            if row is None or row[0] != 2:
+                raise BlockchainDbError(f"{path} is not a v2 blockchain database")
+            log.info("Opened blockchain database %s", path)
+            yield cls(db, constants)
+
+    async def get_peak_height(self) -> uint32:
+        async with self.db.execute(
+            """
+            SELECT full_blocks.height
+            FROM current_peak
+            JOIN full_blocks ON full_blocks.header_hash = current_peak.hash
+            WHERE current_peak.key = 0
+            """
+        ) as cursor:
+            row = await cursor.fetchone()
+        if row is None:
+            raise BlockchainDbError("No peak found in blockchain database")
+        return uint32(row[0])
+
+    async def get_blocks(self, heights: Set[uint32]) -> Dict[uint32, bytes]:
+        heights_db = tuple(heights)
+        async with self.db.execute(
+            f"""
+            SELECT height, block
+            FROM full_blocks
+            WHERE in_main_chain = 1
+            AND height IN ({",".join("?" * len(heights_db))})
+            """,
+            heights_db,
+        ) as cursor:
+            rows = await cursor.fetchall()
+        blocks = {uint32(row[0]): zstd.decompress(row[1]) for row in rows}
+        missing = heights - blocks.keys()
+        if len(missing) > 0:
+            raise BlockchainDbError(f"Blocks not found at heights: {sorted(missing)}")
+        return blocks
+
+    async def lookup_block_generators(
+        self, header_hash: bytes32, generator_refs: Set[uint32]
+    ) -> Dict[uint32, bytes]:
+        # the blocks we process are in the main chain, and so are their references
+        generators: Dict[uint32, bytes] = {}
+        for height, block in (await self.get_blocks(generator_refs)).items():
+            generator = generator_from_block(memoryview(block))
+            if generator is None:
+                raise BlockchainDbError(f"No generator found at height: {height}")
+            generators[height] = generator
+        return generators
+
+    async def fetch_block(
+        self, height: int
+    ) -> Tuple[bytes32, Optional[List[CoinSpend]]]:
+        try:
+            return await self.read_block(height)
+        except BlockchainDbError:
+            raise
+        except Exception as e:
+            # corrupt block data or a failing generator
+            raise BlockchainDbError(
+                f"Failed to read block at height {height}: {e!r}"
+            ) from e
+
+    async def read_block(
+        self, height: int
+    ) -> Tuple[bytes32, Optional[List[CoinSpend]]]:
+        blocks = await self.get_blocks({uint32(height)})
+        full_block = FullBlock.from_bytes(blocks[uint32(height)])
+
+        log.debug("Got block %s at height: %i", full_block.header_hash, height)
+
+        if not full_block.is_transaction_block():
+            log.debug("Skipping non-transaction block at height %i", height)
+            return full_block.header_hash, None
+
+        log.debug("Processing transaction block %s", full_block.header_hash)
+        block_generator = await get_block_generator(
+            self.lookup_block_generators, full_block
+        )
+        if block_generator is None:
+            return full_block.header_hash, None
+
+        coin_spends = await asyncio.to_thread(
+            get_spends_for_block, block_generator, height, self.constants
+        )
+        return full_block.header_hash, coin_spends
@@ -0,0 +1,157 @@
+import asyncio
+from contextlib import AsyncExitStack, asynccontextmanager
+import itertools
+import logging
+import random
+import time
+from typing import Any, AsyncIterator, List, Optional
+
+from chia.rpc.full_node_rpc_client import FullNodeRpcClient
+
+from snapcat.config import (
+    chia_config,
+    chia_root,
+    full_node_rpc_port,
+    rpc_backoff,
+    rpc_max_concurrency,
+    rpc_max_retries,
+    rpc_pool_size,
+    rpc_target_latency,
+    rpc_timeout,
+    self_hostname,
+)
+
+log = logging.getLogger("snapcat")
+
+MAX_BACKOFF = 30.0
+
+
+class RpcRequestFailed(Exception):
+    pass
+
+
+class AdaptiveLimiter:
+    """
+    Bounds the number of in-flight requests. The limit grows additively while the
+    node answers below the target latency and shrinks multiplicatively on slow
+    responses or errors (AIMD), at most once per window of requests in flight.
+    """
+
+    def __init__(self, maximum: int, target_latency: float, minimum: int = 1):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.target_latency = target_latency
+        self.limit: float = float(minimum)
+        self.in_flight = 0
+        self._last_decrease = 0.0
+        self._released = asyncio.Event()
+
+    async def acquire(self) -> None:
+        while self.in_flight >= int(self.limit):
+            self._released.clear()
+            await self._released.wait()
+        self.in_flight += 1
+
+    def decrease(self, start: float, factor: float) -> None:
+        # requests started before the last decrease belong to the same window
+        if start < self._last_decrease:
+            return
+        self.limit = max(self.minimum, self.limit * factor)
+        self._last_decrease = time.monotonic()
+
+    def release(
+        self, start: float, latency: Optional[float], failed: bool = False
+    ) -> None:
+        """
+        Release a request started at `start`. Failed requests (errors and
+        timeouts) and slow ones shrink the limit, fast ones grow it; cancelled
+        requests (neither failed nor with a latency) leave it unchanged.
+        """
+        self.in_flight -= 1
+        if failed:
+            self.decrease(start, 0.5)
+        elif latency is not None and latency > self.target_latency:
+            self.decrease(start, 0.75)
+        elif latency is not None:
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+        self._released.set()
+
+
+class FullNodeRpcPool:
+    def __init__(
+        self,
+        clients: List[FullNodeRpcClient],
+        max_concurrency: int = rpc_max_concurrency,
+        max_retries: int = rpc_max_retries,
+        timeout: float = rpc_timeout,
+        backoff: float = rpc_backoff,
+        target_latency: float = rpc_target_latency,
+    ):
+        self._clients = itertools.cycle(clients)
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.backoff = backoff
+        self.limiter = AdaptiveLimiter(max_concurrency, target_latency)
+
+    @classmethod
+    @asynccontextmanager
+    async def create_as_context(
+        cls, pool_size: int = rpc_pool_size
+    ) -> AsyncIterator["FullNodeRpcPool"]:
+        async with AsyncExitStack() as stack:
+            clients = [
+                await stack.enter_async_context(
+                    FullNodeRpcClient.create_as_context(
+                        self_hostname,
+                        full_node_rpc_port,
+                        chia_root,
+                        chia_config,
+                    )
+                )
+                for _ in range(pool_size)
+            ]
+            log.info("Created full node RPC pool with %i clients", pool_size)
+            yield cls(clients)
+
+    async def call(self, method: str, *args: Any, required: bool = False) -> Any:
+        """
+        Call `method` on the next client of the pool, retrying with exponential
+        backoff on errors and timeouts. With `required`, a None result is treated
+        as a failure as well.
+        """
+        last_error: Optional[BaseException] = None
+        for attempt in range(self.max_retries + 1):
+            if attempt > 0:
+                delay = min(MAX_BACKOFF, self.backoff * 2 ** (attempt - 1))
+                await asyncio.sleep(delay * random.uniform(0.5, 1.5))
+
+            client = next(self._clients)
+            await self.limiter.acquire()
+            latency: Optional[float] = None
+            failed = False
+            start = time.monotonic()
+            try:
+                result = await asyncio.wait_for(
+                    getattr(client, method)(*args), self.timeout
+                )
+                if required and result is None:
+                    raise ValueError(f"{method} returned no result")
+                latency = time.monotonic() - start
+                return result
+            except Exception as e:
+                failed = True
+                last_error = e
+                log.warning(
+                    "RPC %s%s failed (attempt %i/%i): %r",
+                    method,
+                    args,
+                    attempt + 1,
+                    self.max_retries + 1,
+                    e,
+                )
+            finally:
+                self.limiter.release(start, latency, failed)
+
+        raise RpcRequestFailed(
+            f"RPC {method}{args} failed after {self.max_retries + 1} attempts"
+        ) from last_error
@@ -0,0 +1,118 @@
+import logging
+
+log = logging.getLogger("snapcat")
+
+
+def balance_bucket(balance: int) -> int:
+    # order of magnitude of the balance in mojos
+    return len(str(balance)) - 1
+
+
+async def create_stats_tables(db):
+    await db.execute(
+        """
+        CREATE TABLE IF NOT EXISTS holders(
+            inner_puzzle_hash TEXT PRIMARY KEY,
+            balance INTEGER NOT NULL,
+            coins INTEGER NOT NULL
+        );
+        """
+    )
+    await db.execute(
+        """
+        CREATE INDEX IF NOT EXISTS holders_balance ON holders(balance DESC);
+        """
+    )
+    await db.execute(
+        """
+        CREATE TABLE IF NOT EXISTS balance_buckets(
+            bucket INTEGER PRIMARY KEY,
+            holders INTEGER NOT NULL,
+            amount INTEGER NOT NULL
+        );
+        """
+    )
+
+    async with db.execute(
+        "SELECT value FROM config WHERE key = 'stats_initialized'"
+    ) as cursor:
+        row = await cursor.fetchone()
+    if row is None:
+        await rebuild_stats(db)
+
+
+async def rebuild_stats(db):
+    log.info("Rebuilding holder statistics from coins")
+    await db.execute("DELETE FROM holders")
+    await db.execute(
+        """
+        INSERT INTO holders(inner_puzzle_hash, balance, coins)
+        SELECT coins.inner_puzzle_hash, sum(coins.amount), count(*)
+        FROM coins
+        LEFT JOIN coin_spends ON coins.coin_name = coin_spends.coin_name
+        WHERE coin_spends.coin_name IS null
+        GROUP BY coins.inner_puzzle_hash
+        """
+    )
+    await db.execute("DELETE FROM balance_buckets")
+    await db.execute(
+        """
+        INSERT INTO balance_buckets(bucket, holders, amount)
+        SELECT length(CAST(balance AS TEXT)) - 1, count(*), sum(balance)
+        FROM holders
+        WHERE balance > 0
+        GROUP BY 1
+        """
+    )
+    await db.execute(
+        """
+        INSERT INTO config(key, value)
+        VALUES('stats_initialized', '1')
+        ON CONFLICT(key) DO UPDATE SET value='1';
+        """
+    )
+    await db.commit()
+
+
+async def update_bucket(db, balance: int, holders: int):
+    await db.execute(
+        """
+        INSERT INTO balance_buckets(bucket, holders, amount) VALUES(?, ?, ?)
+        ON CONFLICT(bucket) DO UPDATE SET
+            holders = holders + excluded.holders,
+            amount = amount + excluded.amount;
+        """,
+        [balance_bucket(balance), holders, holders * balance],
+    )
+
+
+async def update_holder(db, inner_puzzle_hash: str, amount: int, coins: int):
+    async with db.execute(
+        "SELECT balance, coins FROM holders WHERE inner_puzzle_hash = ?",
+        [inner_puzzle_hash],
+    ) as cursor:
+        row = await cursor.fetchone()
+    old_balance, old_coins = (0, 0) if row is None else row
+
+    new_balance = old_balance + amount
+    new_coins = old_coins + coins
+
+    if new_coins > 0:
+        await db.execute(
+            """
+            INSERT INTO holders(inner_puzzle_hash, balance, coins) VALUES(?, ?, ?)
+            ON CONFLICT(inner_puzzle_hash) DO UPDATE SET
+                balance = excluded.balance,
+                coins = excluded.coins;
+            """,
+            [inner_puzzle_hash, new_balance, new_coins],
+        )
+    else:
+        await db.execute(
+            "DELETE FROM holders WHERE inner_puzzle_hash = ?", [inner_puzzle_hash]
+        )
+
+    if old_balance > 0:
+        await update_bucket(db, old_balance, -1)
+    if new_balance > 0:
+        await update_bucket(db, new_balance, 1)
@@ -1,5 +1,4 @@
 from clvm.casts import int_to_bytes
-from chia.rpc.full_node_rpc_client import FullNodeRpcClient
 from chia.types.blockchain_format.sized_bytes import bytes32
 from chia.types.coin_spend import CoinSpend
 from chia.util.hash import std_hash
@@ -9,14 +8,16 @@ import logging
 from typing import List, Optional, Tuple
 
 from snapcat.cat_utils import create_coin_conditions_for_inner_puzzle, extract_cat
+from snapcat.sync_cmd.rpc_pool import FullNodeRpcPool
+from snapcat.sync_cmd.stats import update_holder
 
 log = logging.getLogger("snapcat")
 
 
 async def get_full_node_synced(
-    full_node_rpc: FullNodeRpcClient,
+    rpc_pool: FullNodeRpcPool,
 ) -> Tuple[bool, uint32, uint32]:
-    blockchain_state = await full_node_rpc.get_blockchain_state()
+    blockchain_state = await rpc_pool.call("get_blockchain_state")
     sync_state = blockchain_state["sync"]
     synced = sync_state["synced"]
     if not synced:
@@ -25,6 +26,11 @@ async def get_full_node_synced(
         return True, blockchain_state["peak"].height, None
 
 
+async def get_peak_height(rpc_pool: FullNodeRpcPool) -> uint32:
+    _, peak_height, _ = await get_full_node_synced(rpc_pool)
+    return peak_height
+
+
 async def process_coin_spends(
     db,
     expected_tail_hash: bytes32,
@@ -62,7 +68,7 @@ async def process_coin_spends(
                 )
             )
 
-            await db.execute(
+            cursor = await db.execute(
                 """
                 INSERT OR IGNORE INTO coin_spends values (?, ?, ?)
                 """,
@@ -72,6 +78,16 @@ async def process_coin_spends(
                     len(inner_puzzle_create_coin_conditions),
                 ],
             )
+            if cursor.rowcount == 1:
+                # newly spent, remove it from the holder stats if we saw it created
+                async with db.execute(
+                    "SELECT inner_puzzle_hash, amount FROM coins WHERE coin_name = ?",
+                    [coin_spend_coin_name],
+                ) as spent_cursor:
+                    spent_coin = await spent_cursor.fetchone()
+                if spent_coin is not None:
+                    await update_holder(db, spent_coin[0], -spent_coin[1], -1)
+
             for coin in inner_puzzle_create_coin_conditions:
                 outer_puzzle_hash = CAT_MOD.curry(
                     CAT_MOD.get_tree_hash(),
@@ -85,44 +101,68 @@ async def process_coin_spends(
                     + int_to_bytes(coin.amount)
                 ).hex()
 
-                await db.execute(
+                cursor = await db.execute(
                     """
-                    INSERT OR IGNORE INTO coins values (?, ?, ?, ?)
+                    INSERT OR IGNORE INTO coins(
+                        coin_name,
+                        inner_puzzle_hash,
+                        amount,
+                        created_height,
+                        parent_coin_name
+                    ) values (?, ?, ?, ?, ?)
                     """,
                     [
                         created_coin_name,
                         coin.puzzle_hash.hex(),
                         coin.amount,
                         height,
+                        coin_spend_coin_name,
                     ],
                 )
-
-
-async def process_block(
-    full_node_rpc: FullNodeRpcClient, db, tail_hash: bytes32, height: int
-):
-    block_record = await full_node_rpc.get_block_record_by_height(height)
-    if block_record is None:
-        log.error("Failed to get block record at height: %i", height)
-        return
+                if cursor.rowcount == 1:
+                    # ephemeral coins may already be spent within the same block
+                    async with db.execute(
+                        "SELECT 1 FROM coin_spends WHERE coin_name = ?",
+                        [created_coin_name],
+                    ) as spent_cursor:
+                        spent = await spent_cursor.fetchone()
+                    if spent is None:
+                        await update_holder(db, coin.puzzle_hash.hex(), coin.amount, 1)
+
+
+async def fetch_block(
+    rpc_pool: FullNodeRpcPool, height: int
+) -> Tuple[bytes32, Optional[List[CoinSpend]]]:
+    block_record = await rpc_pool.call(
+        "get_block_record_by_height", height, required=True
+    )
 
     log.debug("Got block record %s at height: %i", block_record.header_hash, height)
 
-    if block_record.timestamp is not None:
-        log.debug("Processing transaction block %s", block_record.header_hash)
+    if block_record.timestamp is None:
+        log.debug("Skipping non-transaction block at height %i", height)
+        return block_record.header_hash, None
 
-        coin_spends = await full_node_rpc.get_block_spends(block_record.header_hash)
+    log.debug("Processing transaction block %s", block_record.header_hash)
+    # get_block_spends returns None on any error, an empty list is a valid result
+    coin_spends = await rpc_pool.call(
+        "get_block_spends", block_record.header_hash, required=True
+    )
+    return block_record.header_hash, coin_spends
 
-        if coin_spends is not None and len(coin_spends) > 0:
-            log.debug("%i spends found in block %i", len(coin_spends), height)
-            await process_coin_spends(
-                db, tail_hash, height, block_record.header_hash, coin_spends
-            )
 
-        else:
-            log.debug("None at %i", height)
+async def process_block(
+    db,
+    tail_hash: bytes32,
+    height: int,
+    header_hash: bytes32,
+    coin_spends: Optional[List[CoinSpend]],
+):
+    if coin_spends is not None and len(coin_spends) > 0:
+        log.debug("%i spends found in block %i", len(coin_spends), height)
+        await process_coin_spends(db, tail_hash, height, header_hash, coin_spends)
     else:
-        log.debug("Skipping non-transaction block at height %i", height)
+        log.debug("None at %i", height)
 
     await db.execute(
         """
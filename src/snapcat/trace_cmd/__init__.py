@@ -0,0 +1,278 @@
+import aiosqlite
+import asyncio
+import json
+import logging
+import os
+import rich_click as click
+from rich.console import Console
+from rich.table import Table
+from typing import List, Optional, Set
+
+from chia.types.blockchain_format.sized_bytes import bytes32
+
+from snapcat.shared import Bytes32ParamType
+
+log = logging.getLogger("snapcat")
+console = Console()
+err_console = Console(stderr=True)
+
+
+LINEAGE_BATCH_SIZE = 500
+
+
+async def get_lineage_coins(db, coin_names: List[str]):
+    # coins that were not created by a synced spend (e.g. spent eve coins) only
+    # have their coin name and spent height
+    async with db.execute(
+        """
+            SELECT
+                names.value,
+                coins.parent_coin_name,
+                coins.inner_puzzle_hash,
+                coins.amount,
+                coins.created_height,
+                coin_spends.spent_height
+            FROM json_each(?) AS names
+            LEFT JOIN coins ON coins.coin_name = names.value
+            LEFT JOIN coin_spends ON coin_spends.coin_name = names.value
+        """,
+        [json.dumps(coin_names)],
+    ) as cursor:
+        return await cursor.fetchall()
+
+
+async def get_lineage_start_height(db) -> Optional[int]:
+    async with db.execute(
+        "SELECT value FROM config WHERE key = 'lineage_start_height'"
+    ) as cursor:
+        row = await cursor.fetchone()
+    return None if row is None else int(row[0])
+
+
+def is_lineage_incomplete(row, lineage_start_height: Optional[int]) -> bool:
+    # coins created before the lineage was stored have no parent, and coins spent
+    # before it have children without a parent
+    if lineage_start_height is None:
+        return False
+    _, _, parent_coin_name, _, _, created_height, spent_height = row
+    return (
+        parent_coin_name is None
+        and created_height is not None
+        and created_height < lineage_start_height
+    ) or (spent_height is not None and spent_height < lineage_start_height)
+
+
+async def get_lineage(
+    db,
+    coin_name: Optional[bytes32],
+    puzzle_hash: Optional[bytes32],
+    ancestors: bool,
+    depth: int,
+    limit: int,
+):
+    """
+    Walk the lineage breadth-first, one level at a time, yielding every coin once
+    at its smallest depth. At most `limit` coins are ever visited, which bounds
+    the memory used.
+    """
+    if limit == 0:
+        return
+
+    if coin_name is not None:
+        frontier = [coin_name.hex()]
+    else:
+        assert puzzle_hash is not None
+        async with db.execute(
+            "SELECT coin_name FROM coins WHERE inner_puzzle_hash = ? LIMIT ?",
+            [puzzle_hash.hex(), limit],
+        ) as cursor:
+            frontier = [row[0] async for row in cursor]
+    visited: Set[str] = set(frontier)
+    coins_count = 0
+
+    for level in range(depth + 1):
+        next_frontier: List[str] = []
+        for batch_start in range(0, len(frontier), LINEAGE_BATCH_SIZE):
+            batch_end = batch_start + LINEAGE_BATCH_SIZE
+            batch = frontier[batch_start:batch_end]
+            rows = await get_lineage_coins(db, batch)
+            for row in rows:
+                yield (level, *row)
+                coins_count = coins_count + 1
+                if coins_count >= limit:
+                    return
+
+            if level == depth or len(visited) >= limit:
+                continue
+
+            if ancestors:
+                candidates = [row[1] for row in rows if row[1] is not None]
+            else:
+                async with db.execute(
+                    """
+                        SELECT coin_name
+                        FROM coins
+                        WHERE parent_coin_name IN (SELECT value FROM json_each(?))
+                    """,
+                    [json.dumps(batch)],
+                ) as cursor:
+                    candidates = [row[0] async for row in cursor]
+
+            for candidate in candidates:
+                if candidate not in visited and len(visited) < limit:
+                    visited.add(candidate)
+                    next_frontier.append(candidate)
+
+        frontier = next_frontier
+        if len(frontier) == 0:
+            return
+
+
+@click.command(help="Trace the descendants or ancestors of a CAT coin.")
+@click.option(
+    "-c",
+    "--coin-name",
+    required=False,
+    default=None,
+    help="The coin name to start tracing from",
+    type=Bytes32ParamType(),
+)
+@click.option(
+    "-p",
+    "--puzzle-hash",
+    required=False,
+    default=None,
+    help="The (inner) puzzle hash whose coins to start tracing from",
+    type=Bytes32ParamType(),
+)
+@click.option(
+    "-a",
+    "--ancestors",
+    is_flag=True,
+    default=False,
+    help="Trace the ancestors instead of the descendants",
+)
+@click.option(
+    "-d",
+    "--depth",
+    required=False,
+    default=10,
+    help="The maximum number of hops to follow",
+    type=click.IntRange(min=0),
+)
+@click.option(
+    "-l",
+    "--limit",
+    required=False,
+    default=1000,
+    help="The maximum number of coins to show",
+    type=click.IntRange(min=0),
+)
+@click.option(
+    "-j",
+    "--json",
+    "as_json",
+    is_flag=True,
+    default=False,
+    help="Print as JSON instead of a table",
+)
+@click.pass_context
+def trace(
+    ctx,
+    coin_name: Optional[bytes32],
+    puzzle_hash: Optional[bytes32],
+    ancestors: bool,
+    depth: int,
+    limit: int,
+    as_json: bool,
+):
+    async def _trace():
+        if (coin_name is None) == (puzzle_hash is None):
+            message = "Provide either a coin name or a puzzle hash"
+            log.error(message)
+            console.print(f"[bold red]{message}")
+            exit()
+
+        db_file_name = ctx.obj["db_file_name"]
+        if db_file_name is None:
+            message = "No database file name provided"
+            log.error(message)
+            console.print(f"[bold red]{message}")
+            exit()
+
+        if not os.path.exists(db_file_name):
+            message = "No database file found, please sync first"
+            log.error(message)
+            console.print(f"[bold red]{message}")
+            exit()
+
+        async with aiosqlite.connect(db_file_name) as db:
+            async with db.execute("PRAGMA table_info(coins)") as cursor:
+                columns = [row[1] for row in await cursor.fetchall()]
+                if "parent_coin_name" not in columns:
+                    message = "No coin lineage found, please sync first"
+                    log.error(message)
+                    console.print(f"[bold red]{message}")
+                    exit()
+
+            lineage_start_height = await get_lineage_start_height(db)
+            lineage = [
+                row
+                async for row in get_lineage(
+                    db, coin_name, puzzle_hash, ancestors, depth, limit
+                )
+            ]
+            incomplete = len(
+                [
+                    row
+                    for row in lineage
+                    if is_lineage_incomplete(row, lineage_start_height)
+                ]
+            )
+
+            if as_json:
+                print(
+                    json.dumps(
+                        [
+                            {
+                                "depth": row[0],
+                                "coin_name": row[1],
+                                "parent_coin_name": row[2],
+                                "puzzle_hash": row[3],
+                                "amount": row[4],
+                                "created_height": row[5],
+                                "spent_height": row[6],
+                            }
+                            for row in lineage
+                        ]
+                    )
+                )
+            else:
+                table = Table(title="Ancestors" if ancestors else "Descendants")
+                table.add_column("Depth", justify="right")
+                table.add_column("Coin Name")
+                table.add_column("Puzzle Hash")
+                table.add_column("Amount", justify="right")
+                table.add_column("Created", justify="right")
+                table.add_column("Spent", justify="right")
+                for row in lineage:
+                    table.add_row(
+                        f"{row[0]}",
+                        row[1],
+                        row[3] or "",
+                        "" if row[4] is None else f"{row[4] / 1e3:,.3f}",
+                        "" if row[5] is None else f"{row[5]}",
+                        "" if row[6] is None else f"{row[6]}",
+                    )
+                console.print(table)
+
+            if incomplete > 0:
+                message = (
+                    f"{incomplete} traced coins were synced before the coin lineage "
+                    f"was stored (height {lineage_start_height}), their parents or "
+                    "children are missing and the trace may be incomplete"
+                )
+                log.warning(message)
+                err_console.print(f"[bold yellow]{message}")
+
+    asyncio.run(_trace())
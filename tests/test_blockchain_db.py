@@ -0,0 +1,241 @@
+import sqlite3
+import tempfile
+import unittest
+from typing import List, Optional
+
+from chia.consensus.default_constants import DEFAULT_CONSTANTS
+from chia.types.blockchain_format.classgroup import ClassgroupElement
+from chia.types.blockchain_format.foliage import (
+    Foliage,
+    FoliageBlockData,
+    FoliageTransactionBlock,
+    TransactionsInfo,
+)
+from chia.types.blockchain_format.pool_target import PoolTarget
+from chia.types.blockchain_format.program import Program
+from chia.types.blockchain_format.proof_of_space import ProofOfSpace
+from chia.types.blockchain_format.reward_chain_block import RewardChainBlock
+from chia.types.blockchain_format.serialized_program import SerializedProgram
+from chia.types.blockchain_format.sized_bytes import bytes32
+from chia.types.blockchain_format.vdf import VDFInfo, VDFProof
+from chia.types.full_block import FullBlock
+from chia.util.ints import uint8, uint32, uint64, uint128
+from chia_rs import G1Element, G2Element
+import zstd  # type: ignore[import-not-found]
+
+from snapcat.sync_cmd.blockchain_db import BlockchainDb, BlockchainDbError
+
+PARENT_COIN_NAME = bytes32(b"\x01" * 32)
+PUZZLE = Program.to(1)
+AMOUNT = 1000
+
+
+def make_block(
+    height: int,
+    transaction: bool,
+    generator: Optional[Program] = None,
+    generator_refs: List[int] = [],
+) -> FullBlock:
+    vdf_info = VDFInfo(
+        bytes32(b"\x00" * 32), uint64(1), ClassgroupElement.get_default_element()
+    )
+    vdf_proof = VDFProof(uint8(0), b"", False)
+    reward_chain_block = RewardChainBlock(
+        uint128(height + 1),
+        uint32(height),
+        uint128(height + 1),
+        uint8(0),
+        bytes32(b"\x00" * 32),
+        ProofOfSpace(
+            bytes32(b"\x00" * 32), G1Element(), None, G1Element(), uint8(32), b""
+        ),
+        None,
+        G2Element(),
+        vdf_info,
+        None,
+        G2Element(),
+        vdf_info,
+        None,
+        transaction,
+    )
+    foliage = Foliage(
+        bytes32(height.to_bytes(32, "big")),
+        bytes32(b"\x00" * 32),
+        FoliageBlockData(
+            bytes32(b"\x00" * 32),
+            PoolTarget(bytes32(b"\x00" * 32), uint32(0)),
+            None,
+            bytes32(b"\x00" * 32),
+            bytes32(b"\x00" * 32),
+        ),
+        G2Element(),
+        bytes32(b"\x02" * 32) if transaction else None,
+        G2Element() if transaction else None,
+    )
+    return FullBlock(
+        [],
+        reward_chain_block,
+        None,
+        vdf_proof,
+        None,
+        vdf_proof,
+        None,
+        foliage,
+        (
+            FoliageTransactionBlock(
+                bytes32(b"\x00" * 32),
+                uint64(1),
+                bytes32(b"\x00" * 32),
+                bytes32(b"\x00" * 32),
+                bytes32(b"\x00" * 32),
+                bytes32(b"\x00" * 32),
+            )
+            if transaction
+            else None
+        ),
+        (
+            TransactionsInfo(
+                bytes32(b"\x00" * 32),
+                bytes32(b"\x00" * 32),
+                G2Element(),
+                uint64(0),
+                uint64(0),
+                [],
+            )
+            if transaction
+            else None
+        ),
+        None if generator is None else SerializedProgram.from_bytes(bytes(generator)),
+        [uint32(ref) for ref in generator_refs],
+    )
+
+
+def make_fixture_db(path: str, version: int = 2):
+    spend_generator = Program.to(
+        (1, [[[PARENT_COIN_NAME, PUZZLE, AMOUNT, Program.to([])]]])
+    )
+    # main chain: 0 non-transaction, 1 generator, 2 generator referencing 1,
+    # 4 corrupt, 5 failing generator; 3 is an orphan only
+    main_chain = {
+        0: make_block(0, False),
+        1: make_block(1, True, spend_generator),
+        2: make_block(2, True, spend_generator, [1]),
+        5: make_block(5, True, Program.to([8])),
+    }
+    with sqlite3.connect(path) as db:
+        db.execute("CREATE TABLE database_version(version int)")
+        db.execute("INSERT INTO database_version VALUES (?)", [version])
+        db.execute(
+            """
+            CREATE TABLE full_blocks(
+                header_hash blob PRIMARY KEY,
+                prev_hash blob,
+                height bigint,
+                sub_epoch_summary blob,
+                is_fully_compactified tinyint,
+                in_main_chain tinyint,
+                block blob,
+                block_record blob
+            )
+            """
+        )
+        db.execute("CREATE TABLE current_peak(key int PRIMARY KEY, hash blob)")
+        for height, block in main_chain.items():
+            db.execute(
+                "INSERT INTO full_blocks VALUES (?, ?, ?, null, 0, 1, ?, null)",
+                [
+                    block.header_hash,
+                    block.prev_header_hash,
+                    height,
+                    zstd.compress(bytes(block)),
+                ],
+            )
+        orphan = make_block(3, False)
+        db.execute(
+            "INSERT INTO full_blocks VALUES (?, ?, 3, null, 0, 0, ?, null)",
+            [orphan.header_hash, orphan.prev_header_hash, zstd.compress(bytes(orphan))],
+        )
+        db.execute(
+            "INSERT INTO full_blocks VALUES (?, null, 4, null, 0, 1, ?, null)",
+            [b"\x04" * 32, b"not a block"],
+        )
+        db.execute(
+            "INSERT INTO current_peak VALUES (0, ?)", [main_chain[2].header_hash]
+        )
+
+
+class TestBlockchainDb(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = f"{self.tmp_dir.name}/blockchain_v2_mainnet.sqlite"
+        make_fixture_db(self.path)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    async def test_rejects_v1_database(self):
+        path = f"{self.tmp_dir.name}/blockchain_v1_mainnet.sqlite"
+        make_fixture_db(path, version=1)
+        with self.assertRaises(BlockchainDbError):
+            async with BlockchainDb.create_as_context(path, DEFAULT_CONSTANTS):
+                pass
+
+    async def test_get_peak_height(self):
+        async with BlockchainDb.create_as_context(
+            self.path, DEFAULT_CONSTANTS
+        ) as blockchain_db:
+            self.assertEqual(await blockchain_db.get_peak_height(), 2)
+
+    async def test_get_blocks_missing_height(self):
+        async with BlockchainDb.create_as_context(
+            self.path, DEFAULT_CONSTANTS
+        ) as blockchain_db:
+            # height 3 only has an orphaned block
+            with self.assertRaises(BlockchainDbError):
+                await blockchain_db.get_blocks({uint32(2), uint32(3)})
+            blocks = await blockchain_db.get_blocks({uint32(0), uint32(1)})
+            self.assertEqual(set(blocks.keys()), {0, 1})
+
+    async def test_fetch_non_transaction_block(self):
+        async with BlockchainDb.create_as_context(
+            self.path, DEFAULT_CONSTANTS
+        ) as blockchain_db:
+            header_hash, coin_spends = await blockchain_db.fetch_block(0)
+            self.assertEqual(header_hash, make_block(0, False).header_hash)
+            self.assertIsNone(coin_spends)
+
+    async def test_fetch_transaction_block(self):
+        async with BlockchainDb.create_as_context(
+            self.path, DEFAULT_CONSTANTS
+        ) as blockchain_db:
+            for height in (1, 2):
+                _, coin_spends = await blockchain_db.fetch_block(height)
+                assert coin_spends is not None
+                self.assertEqual(len(coin_spends), 1)
+                coin = coin_spends[0].coin
+                self.assertEqual(coin.parent_coin_info, PARENT_COIN_NAME)
+                self.assertEqual(coin.puzzle_hash, PUZZLE.get_tree_hash())
+                self.assertEqual(coin.amount, AMOUNT)
+
+    async def test_lookup_block_generators(self):
+        async with BlockchainDb.create_as_context(
+            self.path, DEFAULT_CONSTANTS
+        ) as blockchain_db:
+            generators = await blockchain_db.lookup_block_generators(
+                bytes32(b"\x00" * 32), {uint32(1)}
+            )
+            self.assertEqual(list(generators.keys()), [1])
+            # the non-transaction block has no generator
+            with self.assertRaises(BlockchainDbError):
+                await blockchain_db.lookup_block_generators(
+                    bytes32(b"\x00" * 32), {uint32(0)}
+                )
+
+    async def test_fetch_block_errors(self):
+        async with BlockchainDb.create_as_context(
+            self.path, DEFAULT_CONSTANTS
+        ) as blockchain_db:
+            # orphan only, corrupt block data and a failing generator
+            for height in (3, 4, 5):
+                with self.assertRaises(BlockchainDbError):
+                    await blockchain_db.fetch_block(height)